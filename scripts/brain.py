@@ -11,33 +11,210 @@ Usage:
   brain summary
   brain linear <issue description>
   brain linear-project <project name> [description]
+  brain serve                  # long-lived daemon; other commands reuse it
 """
 
 import asyncio
+import json
 import logging
 import os
 import sys
 
-# Locate the project's src directory
+# Locate the project's src directory. The insert happens in main() so merely
+# importing this module (tests, tooling) has no side effects; config lookup
+# does not depend on CWD since CONFIG_PATH is resolved from config.py itself.
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SRC_DIR = os.path.join(SCRIPT_DIR, "..", "src")
-sys.path.insert(0, SRC_DIR)
 
-# Ensure we run from the right directory for config
-os.chdir(os.path.join(SCRIPT_DIR, ".."))
+_VERBOSE_FLAGS = frozenset({"-v", "--verbose"})
+_QUIET_FLAGS = frozenset({"-q", "--quiet"})
+_FLAGS = _VERBOSE_FLAGS | _QUIET_FLAGS
+
+# Unix socket for the 'brain serve' daemon, which keeps one RAGPipeline in
+# memory so consecutive CLI commands skip pipeline/database init.
+SOCKET_PATH = os.path.expanduser("~/.project-brain/brain.sock")
+
+
+class RemoteRAG:
+    """Thin client that forwards commands to a running 'brain serve' daemon.
+
+    Mirrors the RAGPipeline methods the CLI handlers use, so handlers don't
+    care whether they talk to an in-process pipeline or the daemon.
+    """
+
+    async def _call(self, command: str, args: list[str], force: bool = False) -> str:
+        reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
+        try:
+            payload = {"command": command, "args": args, "force": force}
+            writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+        return json.loads(line).get("result", "")
+
+    async def ask(self, question: str) -> str:
+        return await self._call("ask", [question])
+
+    async def search(self, query: str, n: int = 5) -> str:
+        return await self._call("search", [query])
+
+    async def index(self, project_path=None, force: bool = False) -> str:
+        return await self._call("index", [], force=force)
+
+    async def get_summary(self) -> str:
+        return await self._call("summary", [])
+
+
+async def _daemon_available() -> bool:
+    """Probe whether a 'brain serve' daemon accepts connections."""
+    if not os.path.exists(SOCKET_PATH):
+        return False
+    try:
+        _, writer = await asyncio.open_unix_connection(SOCKET_PATH)
+        writer.close()
+        await writer.wait_closed()
+        return True
+    except OSError:
+        return False
 
 
 def setup_logging(verbose: bool = False, quiet: bool = False) -> None:
     level = logging.DEBUG if verbose else (logging.WARNING if quiet else logging.INFO)
+    if quiet and not verbose and not os.environ.get("BRAIN_LOG"):
+        # Skip the handler/formatter setup entirely: logging.lastResort
+        # already prints WARNING+ records bare to stderr, which matches the
+        # message-only format below.
+        logging.getLogger("project-brain").setLevel(level)
+        return
     logging.basicConfig(level=level, format="%(message)s", stream=sys.stderr, force=True)
     logging.getLogger("project-brain").setLevel(level)
 
 
+# Command handlers. Each takes (rag, args, quiet) and does its own heavy
+# imports, so e.g. 'brain ask' never pays for the Linear/httpx stack.
+
+async def _cmd_ask(rag, args, quiet):
+    if not args:
+        print("Usage: brain ask <question>")
+        sys.exit(1)
+    question = " ".join(args)
+    print(f"\nAsking about the project: {question}\n")
+    print("─" * 50)
+    print(await rag.ask(question))
+
+
+async def _cmd_search(rag, args, quiet):
+    if not args:
+        print("Usage: brain search <query>")
+        sys.exit(1)
+    print(await rag.search(" ".join(args)))
+
+
+async def _cmd_index(rag, args, quiet):
+    force = "--force" in args or "-f" in args
+    if not quiet:
+        print("Indexing project...\n")
+    print(await rag.index(force=force))
+
+
+async def _cmd_summary(rag, args, quiet):
+    result = await rag.get_summary()
+    print("\nProject Overview\n")
+    print("─" * 50)
+    print(result)
+
+
+async def _cmd_linear(rag, args, quiet):
+    if not args:
+        print("Usage: brain linear <issue description>")
+        sys.exit(1)
+    from linear_integration import create_issue
+    print(await create_issue(" ".join(args), rag=rag))
+
+
+async def _cmd_linear_project(rag, args, quiet):
+    if not args:
+        print("Usage: brain linear-project <project name> [description]")
+        sys.exit(1)
+    name = args[0]
+    description = " ".join(args[1:]) if len(args) > 1 else None
+    from linear_integration import create_project
+    print(await create_project(name, description=description, rag=rag))
+
+
+async def _cmd_serve(rag, args, quiet):
+    """Run a long-lived daemon that keeps the RAGPipeline in memory."""
+    os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+
+    async def handle(reader, writer):
+        try:
+            line = await reader.readline()
+            if not line.strip():
+                return
+            req = json.loads(line)
+            command = req.get("command")
+            cmd_args = req.get("args", [])
+            if command == "ask":
+                result = await rag.ask(" ".join(cmd_args))
+            elif command == "search":
+                result = await rag.search(" ".join(cmd_args))
+            elif command == "index":
+                result = await rag.index(force=req.get("force", False))
+            elif command == "summary":
+                result = await rag.get_summary()
+            else:
+                result = f"Unknown daemon command: {command}"
+        except Exception as e:
+            result = f"Error: {e}"
+        try:
+            writer.write(json.dumps({"result": result}).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle, path=SOCKET_PATH)
+    if not quiet:
+        print(f"brain daemon listening on {SOCKET_PATH} (Ctrl-C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+        if hasattr(rag, "aclose"):
+            await rag.aclose()
+
+
+# Commands that only need the four core RAG methods and can therefore be
+# served by a running daemon instead of a fresh in-process pipeline.
+_DAEMON_HANDLERS = frozenset({"ask", "a", "search", "s", "index", "i", "summary", "sum"})
+
+HANDLERS = {
+    "serve": _cmd_serve,
+    "ask": _cmd_ask, "a": _cmd_ask,
+    "search": _cmd_search, "s": _cmd_search,
+    "index": _cmd_index, "i": _cmd_index,
+    "summary": _cmd_summary, "sum": _cmd_summary,
+    "linear": _cmd_linear,
+    "linear-project": _cmd_linear_project,
+    "linearproject": _cmd_linear_project,
+    "lp": _cmd_linear_project,
+}
+
+
 async def main():
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+
     argv = sys.argv[1:]
-    verbose = "-v" in argv or "--verbose" in argv
-    quiet = "-q" in argv or "--quiet" in argv
-    argv = [a for a in argv if a not in ("-v", "--verbose", "-q", "--quiet")]
+    argset = set(argv)
+    verbose = not argset.isdisjoint(_VERBOSE_FLAGS)
+    quiet = not argset.isdisjoint(_QUIET_FLAGS)
+    argv = [a for a in argv if a not in _FLAGS]
 
     if not argv or argv[0] in ("-h", "--help"):
         print(__doc__)
@@ -49,65 +226,26 @@ async def main():
     command = argv[0].lower()
     args = argv[1:]
 
-    from rag_pipeline import RAGPipeline
-    rag = RAGPipeline()
-
-    if command in ("ask", "a"):
-        if not args:
-            print("Usage: brain ask <question>")
-            sys.exit(1)
-        question = " ".join(args)
-        print(f"\nAsking about the project: {question}\n")
-        print("─" * 50)
-        result = await rag.ask(question)
-        print(result)
-
-    elif command in ("search", "s"):
-        if not args:
-            print("Usage: brain search <query>")
-            sys.exit(1)
-        query = " ".join(args)
-        result = await rag.search(query)
-        print(result)
-
-    elif command in ("index", "i"):
-        force = "--force" in args or "-f" in args
-        args = [a for a in args if a not in ("--force", "-f")]
-        if not quiet:
-            print("Indexing project...\n")
-        result = await rag.index(force=force)
-        print(result)
-
-    elif command in ("summary", "sum"):
-        result = await rag.get_summary()
-        print("\nProject Overview\n")
-        print("─" * 50)
-        print(result)
-
-    elif command == "linear":
-        if not args:
-            print("Usage: brain linear <issue description>")
-            sys.exit(1)
-        description = " ".join(args)
-        from linear_integration import create_issue
-        result = await create_issue(description, rag=rag)
-        print(result)
-
-    elif command in ("linear-project", "linearproject", "lp"):
-        if not args:
-            print("Usage: brain linear-project <project name> [description]")
-            sys.exit(1)
-        name = args[0]
-        description = " ".join(args[1:]) if len(args) > 1 else None
-        from linear_integration import create_project
-        result = await create_project(name, description=description, rag=rag)
-        print(result)
-
-    else:
+    handler = HANDLERS.get(command)
+    if handler is None:
         print(f"Unknown command: {command}", file=sys.stderr)
-        print("Available commands: ask, search, index, summary, linear, linear-project", file=sys.stderr)
+        print("Available commands: ask, search, index, summary, linear, linear-project, serve", file=sys.stderr)
         sys.exit(1)
 
+    if command in _DAEMON_HANDLERS and await _daemon_available():
+        rag = RemoteRAG()
+    else:
+        # Deferred until after command validation so bad invocations exit fast
+        from rag_pipeline import RAGPipeline
+        rag = RAGPipeline()
+
+    await handler(rag, args, quiet)
+
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # uvloop is optional (and unavailable on Windows)
     asyncio.run(main())
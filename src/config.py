@@ -4,12 +4,15 @@ Loads config.json, expands ~ in paths, validates required keys.
 Supports environment variable overrides.
 """
 
+import functools
 import json
 import os
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
-CONFIG_PATH = Path(__file__).parent.parent / "config" / "config.json"
+# Resolved once at import so lookups don't depend on CWD or re-resolve parents
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "config.json"
 
 # Env vars that override config (when set)
 ENV_OVERRIDES = {
@@ -21,8 +24,14 @@ ENV_OVERRIDES = {
 }
 
 
-def load_config() -> dict[str, Any]:
-    """Load and validate config. Expands ~ in path values. Applies env overrides."""
+@functools.lru_cache(maxsize=1)
+def load_config() -> Mapping[str, Any]:
+    """Load and validate config. Expands ~ in path values. Applies env overrides.
+
+    The result is cached for the lifetime of the process (the CLI, MCP server
+    and Linear integration all call this) and returned read-only so the cached
+    copy cannot be mutated. Use load_config.cache_clear() to force a reload.
+    """
     if not CONFIG_PATH.exists():
         raise FileNotFoundError(
             f"Config not found: {CONFIG_PATH}\n"
@@ -38,10 +47,10 @@ def load_config() -> dict[str, Any]:
         if val:
             config[config_key] = val
 
-    # Expand ~ in paths
+    # Expand ~ in paths (os.path.expanduser avoids a PurePath construction)
     for key in ("project_path", "database_path"):
         if key in config and config[key]:
-            config[key] = str(Path(config[key]).expanduser())
+            config[key] = os.path.expanduser(config[key])
 
     # Validate required keys
     required = ["project_path", "database_path", "ollama_url", "llm_model", "embed_model"]
@@ -49,4 +58,4 @@ def load_config() -> dict[str, Any]:
     if missing:
         raise ValueError(f"Config missing required keys: {missing}")
 
-    return config
+    return MappingProxyType(config)
@@ -0,0 +1,22 @@
+"""
+JSON helpers backed by orjson when installed, stdlib json otherwise.
+loads() accepts str or bytes; dumps() always returns UTF-8 bytes.
+"""
+
+try:
+    import orjson as _orjson
+
+    def loads(data):
+        return _orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        return _orjson.dumps(obj)
+
+except ImportError:
+    import json as _json
+
+    def loads(data):
+        return _json.loads(data)
+
+    def dumps(obj) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False).encode("utf-8")
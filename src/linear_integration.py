@@ -3,11 +3,179 @@ Linear Integration for project-brain
 Creates Linear issues using AI based on free-text descriptions.
 """
 
+import asyncio
+import hashlib
 import json
-import httpx
+import os
+from pathlib import Path
 
+import jsonutil
 from config import load_config
 
+# Shared HTTP client, created lazily and reused across Ollama + Linear calls
+# so repeated requests keep their TCP/TLS connections alive.
+_client = None
+
+# On-disk cache for LLM-drafted issue content, so retrying the same
+# description (e.g. after a failed Linear call) skips the Ollama round-trip.
+# Set BRAIN_NO_CACHE=1 to bypass.
+DRAFT_CACHE_FILE = Path("~/.cache/project-brain/llm_draft.json").expanduser()
+_DRAFT_CACHE_MAX = 64
+
+
+async def _draft_issue(ollama_url: str, llm_model: str, prompt: str) -> dict:
+    """Ask Ollama to draft issue content and parse the returned JSON."""
+    client = await _get_client()
+    resp = await client.post(
+        f"{ollama_url}/api/generate",
+        json={"model": llm_model, "prompt": prompt, "stream": False}
+    )
+    raw = jsonutil.loads(resp.content)["response"]
+    return _extract_json_object(raw)
+
+
+_TEAM_QUERY = """
+query Team($id: String!) {
+  team(id: $id) {
+    id
+  }
+}
+"""
+
+_CREATE_ISSUE_MUTATION = """
+mutation CreateIssue($title: String!, $description: String, $teamId: String!, $priority: Int) {
+  issueCreate(input: {
+    title: $title
+    description: $description
+    teamId: $teamId
+    priority: $priority
+  }) {
+    success
+    issue {
+      id
+      identifier
+      title
+      url
+    }
+  }
+}
+"""
+
+_CREATE_PROJECT_MUTATION = """
+mutation ProjectCreate($name: String!, $description: String, $teamIds: [String!]) {
+  projectCreate(input: {
+    name: $name
+    description: $description
+    teamIds: $teamIds
+  }) {
+    success
+    project {
+      id
+      name
+      description
+      url
+      state
+    }
+  }
+}
+"""
+
+_LINEAR_BASE_HEADERS = {"Content-Type": "application/json"}
+
+
+async def _validate_team(api_key: str, team_id: str):
+    """Check that the team id exists. Returns an error message or None if OK.
+
+    Network failures and GraphQL errors (bad API key, rate limit, ...) return
+    None — the issueCreate call will surface them accurately. Only a clean
+    response with an explicitly null team means the id itself is wrong.
+    """
+    try:
+        client = await _get_client()
+        resp = await client.post(
+            "https://api.linear.app/graphql",
+            json={"query": _TEAM_QUERY, "variables": {"id": team_id}},
+            headers=_LINEAR_BASE_HEADERS | {"Authorization": api_key},
+            timeout=15
+        )
+        result = jsonutil.loads(resp.content)
+    except Exception:
+        return None
+    if result.get("errors"):
+        return None
+    if result.get("data", {}).get("team") is None:
+        return f"Error: Linear team not found: {team_id}"
+    return None
+
+
+def _extract_json_object(raw: str) -> dict:
+    """Parse the first complete JSON object in an LLM response.
+
+    raw_decode stops at the end of the object, so prose before or after the
+    JSON (which LLMs often add despite instructions) is ignored, and no
+    slice of the full response is allocated.
+    """
+    idx = raw.find("{")
+    if idx == -1:
+        raise ValueError("No JSON object found in LLM response")
+    obj, _ = json.JSONDecoder().raw_decode(raw, idx)
+    return obj
+
+
+def _draft_cache_key(llm_model: str, description: str, project_context: str) -> str:
+    raw = f"{llm_model}|{description}|{project_context}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _draft_cache_get(key: str):
+    if os.environ.get("BRAIN_NO_CACHE"):
+        return None
+    try:
+        cache = jsonutil.loads(DRAFT_CACHE_FILE.read_bytes())
+    except (OSError, ValueError):
+        return None
+    return cache.get(key)
+
+
+def _draft_cache_put(key: str, issue_data: dict):
+    if os.environ.get("BRAIN_NO_CACHE"):
+        return
+    try:
+        cache = jsonutil.loads(DRAFT_CACHE_FILE.read_bytes())
+    except (OSError, ValueError):
+        cache = {}
+    cache.pop(key, None)
+    cache[key] = issue_data
+    # Evict oldest entries (dicts preserve insertion order)
+    while len(cache) > _DRAFT_CACHE_MAX:
+        del cache[next(iter(cache))]
+    try:
+        DRAFT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DRAFT_CACHE_FILE.write_bytes(jsonutil.dumps(cache))
+    except OSError:
+        pass
+
+
+async def _get_client():
+    global _client
+    if _client is None:
+        # Imported here so the CLI doesn't pay for httpx (+ TLS stack) unless
+        # a Linear command is actually used
+        import httpx
+        _client = httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+    return _client
+
+
+async def aclose():
+    """Close the shared HTTP client. Call on server/CLI shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def create_issue(description: str, team_id: str = None, rag=None) -> str:
     """
@@ -56,46 +224,29 @@ Return JSON with these fields:
 {{
   "title": "Short, clear title (max 80 characters)",
   "description": "Detailed description with background, acceptance criteria and any technical details",
-  "priority": 0-4 where 0=none, 1=urgent, 2=high, 3=medium, 4=low,
-  "labelName": "Bug | Feature | Improvement | Documentation | Refactor"
+  "priority": 0-4 where 0=none, 1=urgent, 2=high, 3=medium, 4=low
 }}"""
 
-    try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                f"{ollama_url}/api/generate",
-                json={"model": llm_model, "prompt": prompt, "stream": False}
+    cache_key = _draft_cache_key(llm_model, description, project_context)
+    issue_data = _draft_cache_get(cache_key)
+
+    if issue_data is None:
+        # The team check is an independent round-trip, so run it while the
+        # (much slower) LLM draft is in flight.
+        try:
+            issue_data, team_error = await asyncio.gather(
+                _draft_issue(ollama_url, llm_model, prompt),
+                _validate_team(api_key, default_team),
             )
-            raw = resp.json()["response"]
+        except Exception as e:
+            return f"Error: Could not generate issue data: {e}"
 
-            # Extract JSON from the response
-            start = raw.find("{")
-            end = raw.rfind("}") + 1
-            issue_data = json.loads(raw[start:end])
+        if team_error:
+            return team_error
 
-    except Exception as e:
-        return f"Error: Could not generate issue data: {e}"
+        _draft_cache_put(cache_key, issue_data)
 
     # Create issue via Linear GraphQL API
-    mutation = """
-    mutation CreateIssue($title: String!, $description: String, $teamId: String!, $priority: Int) {
-      issueCreate(input: {
-        title: $title
-        description: $description
-        teamId: $teamId
-        priority: $priority
-      }) {
-        success
-        issue {
-          id
-          identifier
-          title
-          url
-        }
-      }
-    }
-    """
-
     variables = {
         "title": issue_data.get("title", description[:80]),
         "description": issue_data.get("description", description),
@@ -104,28 +255,26 @@ Return JSON with these fields:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                "https://api.linear.app/graphql",
-                json={"query": mutation, "variables": variables},
-                headers={
-                    "Authorization": api_key,
-                    "Content-Type": "application/json"
-                }
-            )
-            result = resp.json()
-
-            if "errors" in result:
-                return f"Error: Linear API error: {result['errors']}"
-
-            issue = result["data"]["issueCreate"]["issue"]
-            return (
-                f"Linear issue created!\n"
-                f"   ID: {issue['identifier']}\n"
-                f"   Title: {issue['title']}\n"
-                f"   Link: {issue['url']}\n\n"
-                f"AI-generated description:\n{variables['description'][:300]}..."
-            )
+        client = await _get_client()
+        resp = await client.post(
+            "https://api.linear.app/graphql",
+            json={"query": _CREATE_ISSUE_MUTATION, "variables": variables},
+            headers=_LINEAR_BASE_HEADERS | {"Authorization": api_key},
+            timeout=30
+        )
+        result = jsonutil.loads(resp.content)
+
+        if "errors" in result:
+            return f"Error: Linear API error: {result['errors']}"
+
+        issue = result["data"]["issueCreate"]["issue"]
+        return (
+            f"Linear issue created!\n"
+            f"   ID: {issue['identifier']}\n"
+            f"   Title: {issue['title']}\n"
+            f"   Link: {issue['url']}\n\n"
+            f"AI-generated description:\n{variables['description'][:300]}..."
+        )
 
     except Exception as e:
         return f"Error: Could not create Linear issue: {e}"
@@ -159,12 +308,13 @@ Project context: {project_context}
 Name: {name}
 Respond with ONLY the description, no quotes or JSON."""
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(
-                    f"{ollama_url}/api/generate",
-                    json={"model": llm_model, "prompt": prompt, "stream": False}
-                )
-                description = resp.json().get("response", "").strip().strip('"')
+            client = await _get_client()
+            resp = await client.post(
+                f"{ollama_url}/api/generate",
+                json={"model": llm_model, "prompt": prompt, "stream": False},
+                timeout=30
+            )
+            description = jsonutil.loads(resp.content).get("response", "").strip().strip('"')
         except Exception:
             description = ""
 
@@ -174,48 +324,27 @@ Respond with ONLY the description, no quotes or JSON."""
         "teamIds": [t for t in default_team_ids if t] or None
     }
 
-    mutation = """
-    mutation ProjectCreate($name: String!, $description: String, $teamIds: [String!]) {
-      projectCreate(input: {
-        name: $name
-        description: $description
-        teamIds: $teamIds
-      }) {
-        success
-        project {
-          id
-          name
-          description
-          url
-          state
-        }
-      }
-    }
-    """
-
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                "https://api.linear.app/graphql",
-                json={"query": mutation, "variables": variables},
-                headers={
-                    "Authorization": api_key,
-                    "Content-Type": "application/json"
-                }
-            )
-            result = resp.json()
-
-            if "errors" in result:
-                return f"Error: Linear API error: {result['errors']}"
-
-            project = result["data"]["projectCreate"]["project"]
-            return (
-                f"Linear project created!\n"
-                f"   Name: {project['name']}\n"
-                f"   State: {project['state']}\n"
-                f"   Link: {project['url']}\n"
-                + (f"\nDescription: {project.get('description', '')[:200]}" if project.get("description") else "")
-            )
+        client = await _get_client()
+        resp = await client.post(
+            "https://api.linear.app/graphql",
+            json={"query": _CREATE_PROJECT_MUTATION, "variables": variables},
+            headers=_LINEAR_BASE_HEADERS | {"Authorization": api_key},
+            timeout=30
+        )
+        result = jsonutil.loads(resp.content)
+
+        if "errors" in result:
+            return f"Error: Linear API error: {result['errors']}"
+
+        project = result["data"]["projectCreate"]["project"]
+        return (
+            f"Linear project created!\n"
+            f"   Name: {project['name']}\n"
+            f"   State: {project['state']}\n"
+            f"   Link: {project['url']}\n"
+            + (f"\nDescription: {project.get('description', '')[:200]}" if project.get("description") else "")
+        )
 
     except Exception as e:
         return f"Error: Could not create Linear project: {e}"
@@ -5,142 +5,153 @@ Connects Cursor, Warp and other MCP clients to your local RAG pipeline + Ollama.
 """
 
 import asyncio
-import json
 import sys
 
-# MCP protocol communication via stdio
-class MCPServer:
-    def __init__(self):
-        self.rag = None
-        self.tools = self._define_tools()
-
-    def _define_tools(self):
-        return [
-            {
-                "name": "ask_project",
-                "description": "Ask a question about the codebase. Uses RAG to find relevant code and answer with full context awareness.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "question": {
-                            "type": "string",
-                            "description": "Your question about the project"
-                        }
-                    },
-                    "required": ["question"]
+import jsonutil
+
+# The tool schema is static: define it once at module scope and pre-serialize
+# the static JSON-RPC responses, substituting only the request id per call.
+_TOOLS = (
+    {
+        "name": "ask_project",
+        "description": "Ask a question about the codebase. Uses RAG to find relevant code and answer with full context awareness.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "question": {
+                    "type": "string",
+                    "description": "Your question about the project"
                 }
             },
-            {
-                "name": "index_project",
-                "description": "Index or update the project codebase in the vector database.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "project_path": {
-                            "type": "string",
-                            "description": "Absolute path to the project (leave empty to use the configured path)"
-                        },
-                        "force": {
-                            "type": "boolean",
-                            "description": "Force re-indexing even if an index already exists"
-                        }
-                    }
+            "required": ["question"]
+        }
+    },
+    {
+        "name": "index_project",
+        "description": "Index or update the project codebase in the vector database.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "project_path": {
+                    "type": "string",
+                    "description": "Absolute path to the project (leave empty to use the configured path)"
+                },
+                "force": {
+                    "type": "boolean",
+                    "description": "Force re-indexing even if an index already exists"
                 }
-            },
-            {
-                "name": "search_code",
-                "description": "Search for specific code, functions or patterns in the project.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "What you are looking for (function, class, concept)"
-                        },
-                        "n_results": {
-                            "type": "integer",
-                            "description": "Number of results to return (default: 5)"
-                        }
-                    },
-                    "required": ["query"]
+            }
+        }
+    },
+    {
+        "name": "search_code",
+        "description": "Search for specific code, functions or patterns in the project.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "What you are looking for (function, class, concept)"
+                },
+                "n_results": {
+                    "type": "integer",
+                    "description": "Number of results to return (default: 5)"
                 }
             },
-            {
-                "name": "get_project_summary",
-                "description": "Get a high-level summary of the project's architecture and structure.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {}
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "get_project_summary",
+        "description": "Get a high-level summary of the project's architecture and structure.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "create_linear_issue",
+        "description": "Create a Linear issue based on a description. AI drafts the title, description and priority automatically.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "description": {
+                    "type": "string",
+                    "description": "Describe what the issue is about"
+                },
+                "team_id": {
+                    "type": "string",
+                    "description": "Linear team ID (optional, uses default from config)"
                 }
             },
-            {
-                "name": "create_linear_issue",
-                "description": "Create a Linear issue based on a description. AI drafts the title, description and priority automatically.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "description": {
-                            "type": "string",
-                            "description": "Describe what the issue is about"
-                        },
-                        "team_id": {
-                            "type": "string",
-                            "description": "Linear team ID (optional, uses default from config)"
-                        }
-                    },
-                    "required": ["description"]
+            "required": ["description"]
+        }
+    },
+    {
+        "name": "create_linear_project",
+        "description": "Create a Linear project. Optionally uses AI to generate a description from the project name and codebase context.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Project name"
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Project description (optional; AI-generated from name if omitted)"
+                },
+                "team_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Team IDs to associate (optional, uses default from config)"
                 }
             },
-            {
-                "name": "create_linear_project",
-                "description": "Create a Linear project. Optionally uses AI to generate a description from the project name and codebase context.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Project name"
-                        },
-                        "description": {
-                            "type": "string",
-                            "description": "Project description (optional; AI-generated from name if omitted)"
-                        },
-                        "team_ids": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Team IDs to associate (optional, uses default from config)"
-                        }
-                    },
-                    "required": ["name"]
-                }
-            }
-        ]
+            "required": ["name"]
+        }
+    }
+)
+
+_INITIALIZE_TEMPLATE = jsonutil.dumps({
+    "jsonrpc": "2.0",
+    "id": "__ID__",
+    "result": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {"tools": {}},
+        "serverInfo": {
+            "name": "project-brain",
+            "version": "1.0.0"
+        }
+    }
+})
+
+_TOOLS_LIST_TEMPLATE = jsonutil.dumps({
+    "jsonrpc": "2.0",
+    "id": "__ID__",
+    "result": {"tools": list(_TOOLS)}
+})
+
 
-    async def handle_request(self, request: dict) -> dict:
+# MCP protocol communication via stdio
+class MCPServer:
+    def __init__(self):
+        self.rag = None
+        self.tools = _TOOLS
+
+    @staticmethod
+    def _fill_id(template: bytes, req_id) -> bytes:
+        return template.replace(b'"__ID__"', jsonutil.dumps(req_id))
+
+    async def handle_request(self, request: dict) -> dict | bytes:
         method = request.get("method")
         params = request.get("params", {})
         req_id = request.get("id")
 
         if method == "initialize":
-            return {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {"tools": {}},
-                    "serverInfo": {
-                        "name": "project-brain",
-                        "version": "1.0.0"
-                    }
-                }
-            }
+            return self._fill_id(_INITIALIZE_TEMPLATE, req_id)
 
         elif method == "tools/list":
-            return {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {"tools": self.tools}
-            }
+            return self._fill_id(_TOOLS_LIST_TEMPLATE, req_id)
 
         elif method == "tools/call":
             tool_name = params.get("name")
@@ -207,39 +218,59 @@ class MCPServer:
     async def run(self):
         """Run the MCP server via stdio (standard for the MCP protocol)."""
         loop = asyncio.get_running_loop()
-        reader = asyncio.StreamReader()
+        # Large limit so oversized JSON-RPC lines don't kill readline()
+        reader = asyncio.StreamReader(limit=16 * 1024 * 1024)
         protocol = asyncio.StreamReaderProtocol(reader)
         await loop.connect_read_pipe(lambda: protocol, sys.stdin)
 
-        write_transport, write_protocol = await loop.connect_write_pipe(
-            asyncio.BaseProtocol, sys.stdout
-        )
-
-        buffer = ""
-        while True:
-            try:
-                chunk = await reader.read(4096)
-                if not chunk:
-                    break
-                buffer += chunk.decode("utf-8")
+        # MCP stdio is strictly sequential request/response, so responses are
+        # written synchronously to stdout — no asyncio write-pipe transport
+        # (and its per-write event loop churn) needed.
+        stdout = sys.stdout.buffer
 
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    line = line.strip()
+        try:
+            while True:
+                try:
+                    # One JSON-RPC message per line; readline() buffers in C
+                    # instead of a Python-side decode + concat + split loop
+                    line = await reader.readline()
                     if not line:
+                        break
+                    if not line.strip():
                         continue
                     try:
-                        request = json.loads(line)
+                        request = jsonutil.loads(line)
                         response = await self.handle_request(request)
-                        output = json.dumps(response) + "\n"
-                        write_transport.write(output.encode("utf-8"))
-                    except json.JSONDecodeError:
+                        # handle_request returns pre-encoded bytes for static
+                        # responses, a dict otherwise
+                        if not isinstance(response, bytes):
+                            response = jsonutil.dumps(response)
+                        stdout.write(response + b"\n")
+                        # If the client pipelined more requests, a complete
+                        # line is already sitting in the reader buffer; defer
+                        # the flush so the whole burst goes out in one syscall.
+                        # (reader._buffer is private, but there is no public
+                        # way to peek at buffered data.)
+                        if b"\n" not in reader._buffer:
+                            stdout.flush()
+                    except ValueError:
                         pass
-            except Exception as e:
-                sys.stderr.write(f"Error: {e}\n")
-                break
+                except Exception as e:
+                    sys.stderr.write(f"Error: {e}\n")
+                    break
+        finally:
+            stdout.flush()
+            if self.rag is not None:
+                await self.rag.aclose()
+            from linear_integration import aclose as close_linear_client
+            await close_linear_client()
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # uvloop is optional (and unavailable on Windows)
     server = MCPServer()
     asyncio.run(server.run())
@@ -3,32 +3,82 @@ RAG Pipeline for project-brain
 Indexes the codebase, saves the vector database persistently and answers questions via Ollama.
 """
 
+import asyncio
 import json
 import hashlib
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 import httpx
+import numpy as np
 
+try:
+    import simsimd  # optional: hand-tuned SIMD cosine kernels
+except ImportError:
+    simsimd = None
+
+try:
+    import blake3  # optional: SIMD hashing for change detection
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash  # optional: fast non-cryptographic hashing
+except ImportError:
+    xxhash = None
+
+try:
+    from numba import njit, prange  # optional: JIT-compiled ranking kernel
+except ImportError:
+    njit = None
+
+import jsonutil
 from config import load_config
 
 logger = logging.getLogger("project-brain")
 
 # File types to index
-DEFAULT_CODE_EXTENSIONS = {
+DEFAULT_CODE_EXTENSIONS = frozenset({
     ".py", ".js", ".ts", ".jsx", ".tsx", ".go", ".rs", ".java",
     ".cpp", ".c", ".h", ".cs", ".rb", ".php", ".swift", ".kt",
     ".vue", ".svelte", ".html", ".css", ".scss", ".sql",
     ".md", ".mdx", ".yaml", ".yml", ".json", ".toml", ".env.example"
-}
+})
 
-DEFAULT_IGNORE_EXTENSIONS = {".min.js", ".min.css", ".bundle.js", ".map"}
+DEFAULT_IGNORE_EXTENSIONS = frozenset({".min.js", ".min.css", ".bundle.js", ".map"})
 
-DEFAULT_IGNORE_DIRS = {
+DEFAULT_IGNORE_DIRS = frozenset({
     "node_modules", ".git", "__pycache__", ".venv", "venv",
     "dist", "build", ".next", ".nuxt", "coverage", ".pytest_cache",
     "project-brain-db", "cdk.out"
-}
+})
+
+# Bumped when the stored chunk format changes in a way that requires
+# re-embedding. v2: embeddings are stored L2-normalized.
+INDEX_SCHEMA_VERSION = 2
+
+# Chunks per /api/embed request, and how many such requests are in flight at
+# once. The embedding server amortizes its per-request overhead over a batch.
+EMBED_BATCH_SIZE = 64
+EMBED_CONCURRENCY = 4
+
+# Query embeddings kept on disk so repeated searches skip the Ollama
+# round-trip entirely
+QUERY_CACHE_MAX = 128
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rank_njit(query, matrix):
+        """Dot the query against every row, spread across physical cores."""
+        n = matrix.shape[0]
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            out[i] = np.dot(matrix[i], query)
+        return out
+else:
+    _rank_njit = None
 
 
 class RAGPipeline:
@@ -43,47 +93,110 @@ class RAGPipeline:
         self._chunk_size = indexing.get("chunk_size", 60)
         self._chunk_overlap = indexing.get("chunk_overlap", 10)
         config_ignore = self.config.get("ignore_dirs")
-        self._ignore_dirs = set(config_ignore) if config_ignore else DEFAULT_IGNORE_DIRS
+        self._ignore_dirs = frozenset(config_ignore) if config_ignore else DEFAULT_IGNORE_DIRS
         config_ignore_ext = self.config.get("ignore_extensions")
-        self._ignore_extensions = set(config_ignore_ext) if config_ignore_ext else DEFAULT_IGNORE_EXTENSIONS
+        self._ignore_extensions = frozenset(config_ignore_ext) if config_ignore_ext else DEFAULT_IGNORE_EXTENSIONS
         config_ext = self.config.get("include_extensions")
-        self._code_extensions = set(config_ext) if config_ext else DEFAULT_CODE_EXTENSIONS
+        self._code_extensions = frozenset(config_ext) if config_ext else DEFAULT_CODE_EXTENSIONS
 
         self.db_path.mkdir(parents=True, exist_ok=True)
         self._index_file = self.db_path / "index.json"
-        self._chunks_file = self.db_path / "chunks.json"
+        self._chunks_file = self.db_path / "chunks.json"  # legacy (pre-split)
+        self._chunks_meta_file = self.db_path / "chunks_meta.json"
+        self._embeddings_file = self.db_path / "embeddings.npy"
         self._summary_file = self.db_path / "summary.json"
-
-        # Load existing index if available
-        self._index = self._load_json(self._index_file, {})
-        self._chunks = self._load_json(self._chunks_file, [])
+        self._query_cache_file = self.db_path / "query_cache.json"
+        self._query_cache = None  # loaded lazily on the first query
+
+        # Load existing index if available. A schema mismatch drops the file
+        # hashes (not the chunks), so the next index() re-embeds everything
+        # into the current format while queries keep working meanwhile.
+        raw_index = self._load_json(self._index_file, {})
+        if raw_index.get("schema_version") == INDEX_SCHEMA_VERSION:
+            self._index = raw_index.get("files", {})
+        else:
+            self._index = {}
+
+        # Chunk metadata and embeddings load lazily on first use (see
+        # _ensure_chunks_loaded), so commands that never touch the index —
+        # summary, Linear drafting — start without parsing the DB at all
+        self._chunks_loaded = False
+        self._embeddings_i8 = None
+        self._http = None  # shared AsyncClient, created on first request
 
     def _load_json(self, path: Path, default):
         if path.exists():
-            with open(path) as f:
-                return json.load(f)
+            return jsonutil.loads(path.read_bytes())
         return default
 
-    def _save_json(self, path: Path, data):
-        with open(path, "w") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _save_json(self, path: Path, data, pretty: bool = False):
+        """Write a JSON artifact; compact by default, indented if pretty.
+
+        Machine-read files (index, chunk metadata, caches) skip the indent:
+        pretty-printing roughly doubles their size and slows every load.
+        """
+        if pretty:
+            with open(path, "w") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        else:
+            path.write_bytes(jsonutil.dumps(data))
 
     def _file_hash(self, path: Path) -> str:
-        return hashlib.md5(path.read_bytes()).hexdigest()
+        """Content hash for change detection; any stable digest will do.
+
+        Digests are prefixed with the algorithm name so switching libraries
+        (or falling back) makes every stored hash look stale, forcing a clean
+        re-index instead of silently trusting mismatched values.
+        """
+        if blake3 is not None:
+            digest, prefix = blake3.blake3(), "b3:"
+        elif xxhash is not None:
+            digest, prefix = xxhash.xxh3_64(), "xxh3:"
+        else:
+            digest, prefix = hashlib.md5(), "md5:"
+        # Stream in 1MB blocks so a large checked-in blob never has to fit
+        # in memory just to be hashed
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return prefix + digest.hexdigest()
 
     def _collect_files(self, root: Path) -> list[Path]:
         files = []
-        for p in root.rglob("*"):
-            if any(part in self._ignore_dirs for part in p.parts):
-                continue
-            if not p.is_file():
-                continue
-            if p.suffix in self._ignore_extensions:
-                continue
-            if p.suffix in self._code_extensions:
-                files.append(p)
+        self._scan_dir(str(root), files)
         return files
 
+    def _scan_dir(self, dir_path: str, files: list[Path]) -> None:
+        """os.scandir walk that prunes ignored dirs instead of descending.
+
+        DirEntry type checks come cached from the directory read, so this
+        avoids the extra stat() per entry that rglob + is_file() paid, and
+        node_modules-style trees are never entered at all. Set lookups are
+        hoisted to locals and the extension comes from one rpartition, since
+        for a 100k-file tree this loop is pure-Python overhead.
+        """
+        ignore_dirs = self._ignore_dirs
+        ignore_extensions = self._ignore_extensions
+        code_extensions = self._code_extensions
+        stack = [dir_path]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignore_dirs:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        _, dot, ext = entry.name.rpartition(".")
+                        suffix = "." + ext if dot else ""
+                        if suffix in ignore_extensions:
+                            continue
+                        if suffix in code_extensions:
+                            files.append(Path(entry.path))
+
     def _chunk_file(self, path: Path, chunk_size: int = None, overlap: int = None) -> list[dict]:
         """Split a file into overlapping text chunks with metadata."""
         chunk_size = chunk_size if chunk_size is not None else self._chunk_size
@@ -94,32 +207,219 @@ class RAGPipeline:
             return []
 
         lines = content.splitlines()
+        n_lines = len(lines)
         chunks = []
         step = chunk_size - overlap
 
-        for i in range(0, max(1, len(lines) - overlap), step):
-            chunk_lines = lines[i:i + chunk_size]
-            text = "\n".join(chunk_lines).strip()
+        # Join once and record where each line starts; every chunk is then a
+        # single string slice instead of a list slice plus per-window join
+        joined = "\n".join(lines)
+        offsets = [0] * (n_lines + 1)
+        pos = 0
+        for idx, line in enumerate(lines):
+            pos += len(line) + 1
+            offsets[idx + 1] = pos
+
+        rel = str(path.relative_to(self.project_path))
+        for i in range(0, max(1, n_lines - overlap), step):
+            end = min(i + chunk_size, n_lines)
+            text = joined[offsets[i]:offsets[end] - 1].strip()
             if not text:
                 continue
             chunks.append({
                 "text": text,
-                "file": str(path.relative_to(self.project_path)),
+                "file": rel,
                 "start_line": i + 1,
-                "end_line": i + len(chunk_lines)
+                "end_line": end
             })
 
         return chunks
 
-    async def _get_embedding(self, text: str) -> list[float]:
-        """Fetch embedding from Ollama."""
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                f"{self.ollama_url}/api/embeddings",
-                json={"model": self.embed_model, "prompt": text}
+    def _http_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client so Ollama requests reuse one connection pool.
+
+        Created lazily on the first request rather than in __init__, since
+        AsyncClient wants to live inside the running event loop.
+        """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=120,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
             )
-            resp.raise_for_status()
-            return resp.json()["embedding"]
+        return self._http
+
+    async def aclose(self) -> None:
+        """Release the shared HTTP client (for long-lived hosts on shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _query_cache_key(self, text: str) -> str:
+        raw = f"{self.embed_model}|{text}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    async def _get_embedding(self, text: str) -> list[float]:
+        """Fetch embedding from Ollama, consulting the on-disk query cache."""
+        if self._query_cache is None:
+            self._query_cache = self._load_json(self._query_cache_file, {})
+        key = self._query_cache_key(text)
+        if key in self._query_cache:
+            # Re-insert so dict order doubles as an LRU: oldest entry first
+            embedding = self._query_cache.pop(key)
+            self._query_cache[key] = embedding
+            return embedding
+
+        resp = await self._http_client().post(
+            f"{self.ollama_url}/api/embeddings",
+            json={"model": self.embed_model, "prompt": text},
+            timeout=60
+        )
+        resp.raise_for_status()
+        embedding = resp.json()["embedding"]
+
+        self._query_cache[key] = embedding
+        while len(self._query_cache) > QUERY_CACHE_MAX:
+            self._query_cache.pop(next(iter(self._query_cache)))
+        self._save_json(self._query_cache_file, self._query_cache)
+        return embedding
+
+    async def _get_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        """Fetch embeddings for several texts in one Ollama request."""
+        resp = await self._http_client().post(
+            f"{self.ollama_url}/api/embed",
+            json={"model": self.embed_model, "input": texts}
+        )
+        resp.raise_for_status()
+        return resp.json()["embeddings"]
+
+    def _normalize_embedding(self, embedding: list[float]) -> list[float]:
+        """L2-normalize an embedding so scoring needs only a dot product."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            return list(embedding)
+        return (vec / norm).tolist()
+
+    def _ensure_chunks_loaded(self) -> None:
+        """Load chunk metadata and the embeddings matrix on first use.
+
+        Metadata and embeddings are stored separately: metadata as JSON,
+        embeddings as a raw float32 .npy that mmaps in instantly instead of
+        parsing megabytes of number text. Metadata itself is a structure of
+        arrays — a deduplicated file table plus parallel per-chunk arrays —
+        so chunk i of the matrix is described by _files[_chunk_file_ids[i]],
+        _chunk_starts[i], etc.
+        """
+        if self._chunks_loaded:
+            return
+        self._chunks_loaded = True
+        if self._chunks_meta_file.exists() and self._embeddings_file.exists():
+            meta = self._load_json(self._chunks_meta_file, {})
+            if isinstance(meta, list):
+                # Earlier split format: one dict per chunk
+                self._set_chunks_from_dicts(meta)
+            else:
+                self._set_chunks(
+                    meta.get("files", []), meta.get("file_ids", []),
+                    meta.get("start_lines", []), meta.get("end_lines", []),
+                    meta.get("texts", []),
+                )
+            self._embeddings_matrix = np.load(self._embeddings_file, mmap_mode="r")
+        else:
+            self._load_legacy_chunks()
+
+    def _set_chunks(self, files, file_ids, starts, ends, texts) -> None:
+        """Install the SoA chunk representation from parallel sequences."""
+        self._files = list(files)
+        self._file_to_id = {f: i for i, f in enumerate(self._files)}
+        self._chunk_file_ids = np.asarray(file_ids, dtype=np.int32)
+        self._chunk_starts = np.asarray(starts, dtype=np.int32)
+        self._chunk_ends = np.asarray(ends, dtype=np.int32)
+        self._chunk_texts = list(texts)
+
+    def _set_chunks_from_dicts(self, chunks: list[dict]) -> None:
+        """Convert per-chunk dicts (older formats) into the SoA layout."""
+        files = []
+        file_to_id = {}
+        file_ids, starts, ends, texts = [], [], [], []
+        for chunk in chunks:
+            rel = chunk.get("file", "")
+            fid = file_to_id.setdefault(rel, len(files))
+            if fid == len(files):
+                files.append(rel)
+            file_ids.append(fid)
+            starts.append(chunk.get("start_line", 0))
+            ends.append(chunk.get("end_line", 0))
+            texts.append(chunk.get("text", ""))
+        self._set_chunks(files, file_ids, starts, ends, texts)
+
+    def _chunk_at(self, i: int) -> dict:
+        """Materialize chunk i as a dict for result formatting."""
+        return {
+            "file": self._files[int(self._chunk_file_ids[i])],
+            "start_line": int(self._chunk_starts[i]),
+            "end_line": int(self._chunk_ends[i]),
+            "text": self._chunk_texts[i],
+        }
+
+    def _load_legacy_chunks(self) -> None:
+        """Load a pre-split chunks.json (embeddings inline) if present.
+
+        Installs the SoA metadata and an L2-normalized float32 matrix; the
+        next index() rewrites the DB in the split format.
+        """
+        legacy = self._load_json(self._chunks_file, [])
+        meta = []
+        rows = []
+        for chunk in legacy:
+            if "embedding" not in chunk:
+                continue
+            rows.append(self._normalize_embedding(chunk["embedding"]))
+            meta.append(chunk)
+        self._set_chunks_from_dicts(meta)
+        if rows:
+            self._embeddings_matrix = np.asarray(rows, dtype=np.float32)
+        else:
+            self._embeddings_matrix = np.empty((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def _quantize_int8(vectors: np.ndarray) -> np.ndarray:
+        """Symmetric int8 quantization of L2-normalized vectors (scale 127)."""
+        return np.clip(np.round(vectors * 127.0), -127, 127).astype(np.int8)
+
+    def _score_all(self, query_embedding: list[float]) -> np.ndarray:
+        """Cosine scores of the query against every embedded chunk."""
+        matrix = self._embeddings_matrix
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        if simsimd is not None and len(matrix):
+            # SimSIMD scores int8 directly (VNNI dot on x86). Rows are unit
+            # vectors, so one constant scale of 127 suffices and the quantized
+            # matrix needs a quarter of the memory bandwidth.
+            if self._embeddings_i8 is None:
+                self._embeddings_i8 = self._quantize_int8(np.asarray(matrix))
+            query_i8 = self._quantize_int8(query)
+            dists = simsimd.cdist(query_i8[None, :], self._embeddings_i8, metric="cosine")
+            return 1.0 - np.asarray(dists, dtype=np.float32)[0]
+        if _rank_njit is not None and len(matrix):
+            return _rank_njit(query, np.asarray(matrix))
+        return matrix @ query
+
+    def _top_k(self, query_embedding: list[float], k: int) -> list[tuple[int, float]]:
+        """(chunk index, score) pairs for the k best chunks, best first.
+
+        Partial selection: an O(N) argpartition keeps the top k, then only
+        those k get the final ordering sort.
+        """
+        scores = self._score_all(query_embedding)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [(int(i), float(scores[i])) for i in idx]
 
     def _cosine_similarity(self, a: list[float], b: list[float]) -> float:
         dot = sum(x * y for x, y in zip(a, b))
@@ -132,9 +432,8 @@ class RAGPipeline:
     async def _check_ollama(self) -> Optional[str]:
         """Verify Ollama is reachable. Returns error message or None if OK."""
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                resp = await client.get(f"{self.ollama_url}/api/tags")
-                resp.raise_for_status()
+            resp = await self._http_client().get(f"{self.ollama_url}/api/tags", timeout=5)
+            resp.raise_for_status()
         except Exception as e:
             return f"Error: Cannot reach Ollama at {self.ollama_url}. Is it running? {e}"
         return None
@@ -150,54 +449,170 @@ class RAGPipeline:
         if not root.exists():
             return f"Error: Path does not exist: {root}"
 
+        self._ensure_chunks_loaded()
+
         files = self._collect_files(root)
         current_files = {str(f.resolve()) for f in files}
 
-        # Prune deleted files from index and chunks
+        # Prune deleted files from the hash index (their chunks simply don't
+        # make it into the rebuilt metadata/matrix below)
         for old_key in list(self._index.keys()):
             if old_key not in current_files:
                 del self._index[old_key]
-        self._chunks = [
-            c for c in self._chunks
-            if str((root / c["file"]).resolve()) in current_files
-        ]
 
-        new_chunks = []
+        new_files = []
+        new_file_to_id = {}
+        new_file_ids, new_starts, new_ends, new_texts = [], [], [], []
+        new_rows = []  # float32 embedding rows aligned with the arrays above
         indexed = 0
         skipped = 0
         total = len(files)
 
+        def intern_file(rel: str) -> int:
+            fid = new_file_to_id.setdefault(rel, len(new_files))
+            if fid == len(new_files):
+                new_files.append(rel)
+            return fid
+
+        # Group existing chunk rows by file id once, so every unchanged file
+        # below is an O(1) lookup rather than a scan over all chunks
+        rows_by_fid = {}
+        for row, fid in enumerate(self._chunk_file_ids.tolist()):
+            rows_by_fid.setdefault(fid, []).append(row)
+
+        # Per-chunk embedding reuse: a changed file usually still consists
+        # mostly of byte-identical chunks whose rows already sit in the
+        # matrix, so only genuinely new text goes to the embedding server
+        row_by_text = {}
+        for row, text in enumerate(self._chunk_texts):
+            row_by_text.setdefault(text, row)
+        reused = 0
+
+        changed_files = []
+
         logger.info("Found %d files to index...", total)
 
-        for i, file in enumerate(files):
-            file_hash = self._file_hash(file)
+        # Hash in parallel: reads are IO-bound and the digest cores release
+        # the GIL, so a thread pool overlaps the per-file disk waits.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            hashes = dict(zip(files, executor.map(self._file_hash, files)))
+
+        for file in files:
+            file_hash = hashes[file]
 
             # Skip if file has not changed
             if not force and self._index.get(str(file)) == file_hash:
                 skipped += 1
-                # Keep existing chunks for this file
-                existing = [c for c in self._chunks if c["file"] == str(file.relative_to(root))]
-                new_chunks.extend(existing)
+                # Keep existing chunks (and their embedding rows) for this file
+                rel = str(file.relative_to(root))
+                old_fid = self._file_to_id.get(rel)
+                if old_fid is not None:
+                    fid = intern_file(rel)
+                    for row in rows_by_fid.get(old_fid, []):
+                        new_file_ids.append(fid)
+                        new_starts.append(int(self._chunk_starts[row]))
+                        new_ends.append(int(self._chunk_ends[row]))
+                        new_texts.append(self._chunk_texts[row])
+                        new_rows.append(np.asarray(self._embeddings_matrix[row], dtype=np.float32))
                 continue
 
-            # Chunk and embed the file
-            chunks = self._chunk_file(file)
-            for chunk in chunks:
-                try:
-                    embedding = await self._get_embedding(chunk["text"])
-                    chunk["embedding"] = embedding
-                    new_chunks.append(chunk)
-                except Exception as e:
-                    logger.warning("Could not embed %s: %s", file, e)
-
+            changed_files.append(file)
             self._index[str(file)] = file_hash
             indexed += 1
-            if (i + 1) % 10 == 0 or i == total - 1:
-                logger.info("Indexed %d/%d files...", i + 1, total)
 
-        self._chunks = new_chunks
-        self._save_json(self._index_file, self._index)
-        self._save_json(self._chunks_file, self._chunks)
+        # Pipeline the changed files: a producer chunks them on executor
+        # threads while bounded consumers embed batches over HTTP, so disk
+        # reads hide behind embedding latency instead of alternating with it.
+        # Batches still amortize Ollama's per-request overhead.
+        if changed_files:
+            logger.info("Chunking and embedding %d changed files...", len(changed_files))
+            loop = asyncio.get_running_loop()
+            queue = asyncio.Queue(maxsize=EMBED_BATCH_SIZE * EMBED_CONCURRENCY)
+            embedded = 0
+            failed_keys = set()  # index keys of files with a failed embed batch
+
+            def add_chunk(chunk, embedding_row):
+                new_file_ids.append(intern_file(chunk["file"]))
+                new_starts.append(chunk["start_line"])
+                new_ends.append(chunk["end_line"])
+                new_texts.append(chunk["text"])
+                new_rows.append(embedding_row)
+
+            async def produce():
+                nonlocal reused
+                for file in changed_files:
+                    chunks = await loop.run_in_executor(None, self._chunk_file, file)
+                    for chunk in chunks:
+                        row = row_by_text.get(chunk["text"])
+                        if row is not None:
+                            add_chunk(chunk, np.asarray(self._embeddings_matrix[row], dtype=np.float32))
+                            reused += 1
+                        else:
+                            await queue.put((str(file), chunk))
+                for _ in range(EMBED_CONCURRENCY):
+                    await queue.put(None)
+
+            async def flush(batch):
+                nonlocal embedded
+                try:
+                    embeddings = await self._get_embeddings_batch([c["text"] for _, c in batch])
+                except Exception as e:
+                    failed_keys.update(key for key, _ in batch)
+                    logger.warning("Could not embed batch of %d chunks: %s", len(batch), e)
+                    return
+                for (_, chunk), embedding in zip(batch, embeddings):
+                    add_chunk(chunk, np.asarray(self._normalize_embedding(embedding), dtype=np.float32))
+                embedded += len(batch)
+                logger.info("Embedded %d chunks...", embedded)
+
+            async def consume():
+                batch = []
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    batch.append(item)
+                    if len(batch) >= EMBED_BATCH_SIZE:
+                        await flush(batch)
+                        batch = []
+                if batch:
+                    await flush(batch)
+
+            await asyncio.gather(produce(), *(consume() for _ in range(EMBED_CONCURRENCY)))
+            if reused:
+                logger.info("Reused embeddings for %d unchanged chunks in changed files", reused)
+            if failed_keys:
+                # A file with a failed batch must not look indexed, or its
+                # missing chunks would survive until a --force reindex. Drop
+                # the hash so the next index() retries those files.
+                for key in failed_keys:
+                    self._index.pop(key, None)
+                logger.warning(
+                    "Embedding failed for %d files; they will be retried on the next index()",
+                    len(failed_keys),
+                )
+
+        self._set_chunks(new_files, new_file_ids, new_starts, new_ends, new_texts)
+        if new_rows:
+            self._embeddings_matrix = np.vstack(new_rows)
+        else:
+            self._embeddings_matrix = np.empty((0, 0), dtype=np.float32)
+        self._embeddings_i8 = None
+
+        self._save_json(self._index_file, {
+            "schema_version": INDEX_SCHEMA_VERSION,
+            "files": self._index,
+        })
+        self._save_json(self._chunks_meta_file, {
+            "files": self._files,
+            "file_ids": self._chunk_file_ids.tolist(),
+            "start_lines": self._chunk_starts.tolist(),
+            "end_lines": self._chunk_ends.tolist(),
+            "texts": self._chunk_texts,
+        })
+        np.save(self._embeddings_file, self._embeddings_matrix)
+        # The split format replaces the legacy single-file DB
+        self._chunks_file.unlink(missing_ok=True)
 
         # Generate a new summary if new files were indexed
         if indexed > 0:
@@ -207,7 +622,7 @@ class RAGPipeline:
             f"Indexing complete!\n"
             f"   New/updated files: {indexed}\n"
             f"   Unchanged (skipped): {skipped}\n"
-            f"   Total chunks in database: {len(new_chunks)}\n"
+            f"   Total chunks in database: {len(new_texts)}\n"
             f"   Database saved to: {self.db_path}"
         )
 
@@ -216,20 +631,13 @@ class RAGPipeline:
         err = await self._check_ollama()
         if err:
             return err
-        if not self._chunks:
+        self._ensure_chunks_loaded()
+        if not self._chunk_texts:
             return "Error: No index found. Run index_project first."
 
         query_embedding = await self._get_embedding(query)
 
-        scored = []
-        for chunk in self._chunks:
-            if "embedding" not in chunk:
-                continue
-            score = self._cosine_similarity(query_embedding, chunk["embedding"])
-            scored.append((score, chunk))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = scored[:n]
+        top = [(score, self._chunk_at(i)) for i, score in self._top_k(query_embedding, n)]
 
         if not top:
             return "No relevant code snippets found."
@@ -246,17 +654,13 @@ class RAGPipeline:
         err = await self._check_ollama()
         if err:
             return err
-        if not self._chunks:
+        self._ensure_chunks_loaded()
+        if not self._chunk_texts:
             return "Error: No index found. Run index_project first."
 
         # Retrieve relevant context
         query_embedding = await self._get_embedding(question)
-        scored = [
-            (self._cosine_similarity(query_embedding, c["embedding"]), c)
-            for c in self._chunks if "embedding" in c
-        ]
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top_chunks = [c for _, c in scored[:8]]
+        top_chunks = [self._chunk_at(i) for i, _ in self._top_k(query_embedding, 8)]
 
         # Build context
         context = "\n\n".join([
@@ -283,17 +687,16 @@ QUESTION: {question}
 Answer concretely and reference specific files and line numbers where relevant."""
 
         # Call Ollama
-        async with httpx.AsyncClient(timeout=120) as client:
-            resp = await client.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.llm_model,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            resp.raise_for_status()
-            return resp.json()["response"]
+        resp = await self._http_client().post(
+            f"{self.ollama_url}/api/generate",
+            json={
+                "model": self.llm_model,
+                "prompt": prompt,
+                "stream": False
+            }
+        )
+        resp.raise_for_status()
+        return resp.json()["response"]
 
     async def get_summary(self) -> str:
         """Return the project overview."""
@@ -334,14 +737,14 @@ Include:
 5. How to run the project (if apparent)"""
 
         try:
-            async with httpx.AsyncClient(timeout=120) as client:
-                resp = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={"model": self.llm_model, "prompt": prompt, "stream": False}
-                )
-                summary = resp.json()["response"]
+            resp = await self._http_client().post(
+                f"{self.ollama_url}/api/generate",
+                json={"model": self.llm_model, "prompt": prompt, "stream": False}
+            )
+            summary = resp.json()["response"]
         except Exception as e:
             summary = f"Could not generate summary: {e}"
 
-        self._save_json(self._summary_file, {"summary": summary})
+        # Kept indented: people open summary.json directly
+        self._save_json(self._summary_file, {"summary": summary}, pretty=True)
         logger.info("Project summary generated")
@@ -0,0 +1,18 @@
+"""Shared test fixtures."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """load_config is cached per-process; clear it so tests stay isolated."""
+    from config import load_config
+
+    load_config.cache_clear()
+    yield
+    load_config.cache_clear()
@@ -33,3 +33,21 @@ def test_load_config_env_override(tmp_path, monkeypatch):
 
     cfg = config_module.load_config()
     assert cfg["project_path"] == "/env/override"
+
+
+def test_load_config_cached(tmp_path, monkeypatch):
+    """Repeated calls return the cached result without re-reading the file."""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({
+        "project_path": "/some/path",
+        "database_path": "/some/db",
+        "ollama_url": "http://localhost:11434",
+        "llm_model": "test",
+        "embed_model": "test",
+    }))
+    import config as config_module
+    monkeypatch.setattr(config_module, "CONFIG_PATH", config_file)
+
+    first = config_module.load_config()
+    config_file.unlink()
+    assert config_module.load_config() is first
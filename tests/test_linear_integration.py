@@ -0,0 +1,64 @@
+"""Tests for the Linear integration draft cache."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+import linear_integration
+
+
+class TestExtractJsonObject:
+    """Test JSON extraction from noisy LLM output."""
+
+    def test_plain_object(self):
+        assert linear_integration._extract_json_object('{"title": "T"}') == {"title": "T"}
+
+    def test_prose_around_object(self):
+        """Text before and after the object (including braces) is ignored."""
+        raw = 'Sure! Here is the issue:\n{"title": "T", "priority": 2}\nLet me know} if...'
+        assert linear_integration._extract_json_object(raw) == {"title": "T", "priority": 2}
+
+    def test_no_object_raises(self):
+        with pytest.raises(ValueError, match="No JSON object"):
+            linear_integration._extract_json_object("no json here")
+
+
+class TestDraftCache:
+    """Test the on-disk LLM draft cache without touching Ollama."""
+
+    def test_cache_roundtrip(self, tmp_path, monkeypatch):
+        """A stored draft is returned for the same key."""
+        monkeypatch.setattr(linear_integration, "DRAFT_CACHE_FILE", tmp_path / "llm_draft.json")
+        key = linear_integration._draft_cache_key("model", "desc", "ctx")
+        assert linear_integration._draft_cache_get(key) is None
+
+        issue = {"title": "T", "description": "D", "priority": 2}
+        linear_integration._draft_cache_put(key, issue)
+        assert linear_integration._draft_cache_get(key) == issue
+
+    def test_cache_evicts_oldest(self, tmp_path, monkeypatch):
+        """The cache is capped and evicts oldest entries first."""
+        monkeypatch.setattr(linear_integration, "DRAFT_CACHE_FILE", tmp_path / "llm_draft.json")
+        monkeypatch.setattr(linear_integration, "_DRAFT_CACHE_MAX", 2)
+
+        for i in range(3):
+            key = linear_integration._draft_cache_key("model", f"desc-{i}", "")
+            linear_integration._draft_cache_put(key, {"title": str(i)})
+
+        oldest = linear_integration._draft_cache_key("model", "desc-0", "")
+        newest = linear_integration._draft_cache_key("model", "desc-2", "")
+        assert linear_integration._draft_cache_get(oldest) is None
+        assert linear_integration._draft_cache_get(newest) == {"title": "2"}
+
+    def test_cache_bypass_env(self, tmp_path, monkeypatch):
+        """BRAIN_NO_CACHE=1 disables both reads and writes."""
+        monkeypatch.setattr(linear_integration, "DRAFT_CACHE_FILE", tmp_path / "llm_draft.json")
+        monkeypatch.setenv("BRAIN_NO_CACHE", "1")
+
+        key = linear_integration._draft_cache_key("model", "desc", "")
+        linear_integration._draft_cache_put(key, {"title": "T"})
+        assert not (tmp_path / "llm_draft.json").exists()
+        assert linear_integration._draft_cache_get(key) is None
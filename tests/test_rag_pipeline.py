@@ -3,12 +3,26 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import rag_pipeline
 from rag_pipeline import RAGPipeline
 
 
+def _pipeline_with_chunks(chunks):
+    """Build a pipeline with the given chunks installed in the SoA layout."""
+    import numpy as np
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline._set_chunks_from_dicts(chunks)
+    rows = [pipeline._normalize_embedding(c["embedding"]) for c in chunks]
+    pipeline._embeddings_matrix = np.asarray(rows, dtype=np.float32)
+    pipeline._embeddings_i8 = None
+    return pipeline
+
+
 class TestRAGPipelineChunking:
     """Test chunking logic without needing Ollama."""
 
@@ -50,6 +64,166 @@ class TestRAGPipelineChunking:
         assert pipeline._cosine_similarity([0, 0], [1, 1]) == 0.0
 
 
+class TestScoringMatrix:
+    """Test the vectorized scoring path without needing Ollama."""
+
+    @pytest.fixture(autouse=True)
+    def numpy_path(self, monkeypatch):
+        """Pin _score_all to the NumPy matmul path: the optional SimSIMD and
+        Numba kernels have their own tolerances (see TestQuantizedScoring)."""
+        monkeypatch.setattr(rag_pipeline, "simsimd", None)
+        monkeypatch.setattr(rag_pipeline, "_rank_njit", None)
+
+    def test_quantize_int8_roundtrip(self):
+        """Quantized unit vectors stay close to the originals at scale 127."""
+        import numpy as np
+        vec = np.asarray([[0.6, 0.8], [1.0, 0.0]], dtype=np.float32)
+        quantized = RAGPipeline._quantize_int8(vec)
+        assert quantized.dtype == np.int8
+        assert np.abs(quantized / 127.0 - vec).max() < 0.005
+
+    def test_matrix_rows_are_normalized(self):
+        """Stored embeddings are L2-normalized so scoring is a dot product."""
+        pipeline = _pipeline_with_chunks([
+            {"text": "a", "embedding": [3.0, 4.0]},
+            {"text": "b", "embedding": [0.0, 2.0]},
+        ])
+        matrix = pipeline._embeddings_matrix
+        assert matrix.shape == (2, 2)
+        for row in matrix:
+            assert abs(float((row * row).sum()) - 1.0) < 1e-6
+
+    def test_score_all_matches_cosine(self):
+        """Matrix scores agree with the scalar cosine implementation."""
+        chunks = [
+            {"text": "a", "embedding": [1.0, 2.0, 3.0]},
+            {"text": "b", "embedding": [-1.0, 0.5, 2.0]},
+            {"text": "c", "embedding": [0.0, 0.0, 1.0]},
+        ]
+        pipeline = _pipeline_with_chunks(chunks)
+        query = [2.0, 1.0, 0.5]
+        scores = pipeline._score_all(query)
+        for score, chunk in zip(scores, chunks):
+            expected = pipeline._cosine_similarity(query, chunk["embedding"])
+            assert abs(float(score) - expected) < 1e-6
+
+    def test_top_k_orders_best_first(self):
+        """_top_k returns (index, score) pairs in descending score order."""
+        pipeline = _pipeline_with_chunks([
+            {"text": "a", "embedding": [1.0, 0.0]},
+            {"text": "b", "embedding": [0.0, 1.0]},
+            {"text": "c", "embedding": [0.7, 0.7]},
+        ])
+        result = pipeline._top_k([1.0, 0.0], 2)
+        assert [i for i, _ in result] == [0, 2]
+        assert result[0][1] >= result[1][1]
+
+    def test_top_k_caps_at_chunk_count(self):
+        """Asking for more results than chunks returns them all."""
+        pipeline = _pipeline_with_chunks([
+            {"text": "a", "embedding": [1.0, 0.0]},
+        ])
+        assert len(pipeline._top_k([1.0, 0.0], 5)) == 1
+
+    def test_soa_layout_dedupes_files(self):
+        """The file table stores each path once; _chunk_at rebuilds dicts."""
+        pipeline = _pipeline_with_chunks([
+            {"text": "a", "file": "x.py", "start_line": 1, "end_line": 5, "embedding": [1.0, 0.0]},
+            {"text": "b", "file": "x.py", "start_line": 4, "end_line": 8, "embedding": [0.0, 1.0]},
+            {"text": "c", "file": "y.py", "start_line": 1, "end_line": 2, "embedding": [1.0, 1.0]},
+        ])
+        assert pipeline._files == ["x.py", "y.py"]
+        assert list(pipeline._chunk_file_ids) == [0, 0, 1]
+        assert pipeline._chunk_at(1) == {
+            "file": "x.py", "start_line": 4, "end_line": 8, "text": "b",
+        }
+
+    def test_legacy_chunks_load_into_split_format(self, tmp_path):
+        """A pre-split chunks.json loads as (meta, matrix); chunks missing an
+        embedding are skipped."""
+        import json
+        legacy_file = tmp_path / "chunks.json"
+        legacy_file.write_text(json.dumps([
+            {"text": "a", "embedding": [3.0, 4.0]},
+            {"text": "no-embedding"},
+        ]))
+        pipeline = RAGPipeline.__new__(RAGPipeline)
+        pipeline._chunks_file = legacy_file
+        pipeline._load_legacy_chunks()
+        assert pipeline._chunk_texts == ["a"]
+        assert pipeline._embeddings_matrix.shape == (1, 2)
+        row = pipeline._embeddings_matrix[0]
+        assert abs(float((row * row).sum()) - 1.0) < 1e-6
+
+
+class TestQuantizedScoring:
+    """Cover the SimSIMD int8 path when the perf extra is installed."""
+
+    @pytest.mark.skipif(rag_pipeline.simsimd is None, reason="simsimd not installed")
+    def test_score_all_int8_close_to_cosine(self):
+        """Quantized scores track the scalar cosine within int8 tolerance."""
+        chunks = [
+            {"text": "a", "embedding": [1.0, 2.0, 3.0]},
+            {"text": "b", "embedding": [-1.0, 0.5, 2.0]},
+            {"text": "c", "embedding": [0.0, 0.0, 1.0]},
+        ]
+        pipeline = _pipeline_with_chunks(chunks)
+        query = [2.0, 1.0, 0.5]
+        scores = pipeline._score_all(query)
+        for score, chunk in zip(scores, chunks):
+            expected = pipeline._cosine_similarity(query, chunk["embedding"])
+            assert abs(float(score) - expected) < 0.02
+
+
+class TestCollectFiles:
+    """Test the directory walker."""
+
+    def test_ignored_dirs_and_extensions(self, tmp_path):
+        """Ignored dirs are pruned and only code extensions are collected."""
+        (tmp_path / "app.py").write_text("print('hi')\n")
+        (tmp_path / "app.map").write_text("x\n")
+        (tmp_path / "photo.png").write_bytes(b"\x89PNG")
+        nested = tmp_path / "src"
+        nested.mkdir()
+        (nested / "util.ts").write_text("export {}\n")
+        ignored = tmp_path / "node_modules" / "pkg"
+        ignored.mkdir(parents=True)
+        (ignored / "index.js").write_text("module.exports = {}\n")
+
+        pipeline = RAGPipeline.__new__(RAGPipeline)
+        pipeline._ignore_dirs = {"node_modules"}
+        pipeline._ignore_extensions = {".map"}
+        pipeline._code_extensions = {".py", ".ts", ".js", ".map"}
+
+        found = sorted(p.name for p in pipeline._collect_files(tmp_path))
+        assert found == ["app.py", "util.ts"]
+
+
+class TestQueryCache:
+    """Test the query-embedding cache without needing Ollama."""
+
+    def _pipeline(self, tmp_path):
+        pipeline = RAGPipeline.__new__(RAGPipeline)
+        pipeline.embed_model = "test-model"
+        pipeline._query_cache_file = tmp_path / "query_cache.json"
+        pipeline._query_cache = None
+        return pipeline
+
+    async def test_cache_hit_skips_http(self, tmp_path):
+        """A cached query never reaches Ollama (no URL is even set)."""
+        pipeline = self._pipeline(tmp_path)
+        key = pipeline._query_cache_key("hello")
+        pipeline._query_cache = {key: [0.1, 0.2]}
+        assert await pipeline._get_embedding("hello") == [0.1, 0.2]
+
+    def test_cache_key_includes_model(self, tmp_path):
+        """Switching embed models must not reuse stale vectors."""
+        pipeline = self._pipeline(tmp_path)
+        key_a = pipeline._query_cache_key("hello")
+        pipeline.embed_model = "other-model"
+        assert pipeline._query_cache_key("hello") != key_a
+
+
 class TestChunkFile:
     """Test _chunk_file with a temp file."""
 